@@ -1,6 +1,12 @@
-import json
 import os
 import boto3
+from botocore.config import Config
+
+# orjson is faster for the request/response payloads; stdlib json is the fallback
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
 
 # Lambda function name - can be set via environment variable
 # Default: client1-private_db_query
@@ -10,6 +16,18 @@ TARGET_FUNCTION = (
     "client1-private_db_query"  # Default Lambda function name
 )
 
+# Reused across calls (and across warm invocations of the calling Lambda) so each query
+# doesn't pay for a new client and a fresh TLS connection to the Lambda API
+_lambda_client = None
+
+
+def _get_lambda_client():
+    """Return the shared boto3 Lambda client, creating it on first use."""
+    global _lambda_client
+    if _lambda_client is None:
+        _lambda_client = boto3.client("lambda", config=Config(max_pool_connections=50))
+    return _lambda_client
+
 
 def database_query(query, params=None):
     """
@@ -30,8 +48,8 @@ def database_query(query, params=None):
             "or the default 'client1-private_db_query' will be used."
         )
     
-    client = boto3.client("lambda")
-    payload = json.dumps({"query": query, "params": params or []})
+    client = _get_lambda_client()
+    payload = _json.dumps({"query": query, "params": params or []})
     
     try:
         resp = client.invoke(
@@ -42,7 +60,7 @@ def database_query(query, params=None):
         
         # Read response payload (it's a stream)
         response_payload = resp["Payload"].read()
-        result = json.loads(response_payload)
+        result = _json.loads(response_payload)
         
         # Handle Lambda invocation errors (Lambda runtime errors, not function errors)
         # Function errors are returned as {"statusCode": 500, "body": "..."} and should be handled by caller
@@ -2,13 +2,24 @@ from __future__ import annotations
 
 import os
 import sys
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 
-from sqlalchemy import create_engine as sa_create_engine, text
+from sqlalchemy import create_engine as sa_create_engine, event, text
 from sqlalchemy.engine import Engine, Connection
 
 
+# Engines keyed by DSN - a warm Lambda container reuses the pooled connections
+# from its previous invocation instead of reconnecting to Postgres every run
+_engines: Dict[str, Engine] = {}
+
+# Connection pool size for direct connections. With ETL_MAX_WORKERS > 1, run_etl loads
+# FK-independent tables concurrently, one pooled connection per worker, so keep this >= ETL_MAX_WORKERS.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '16'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '16'))
+
+
 def get_engine() -> Engine:
     """Create engine for database connection.
     
@@ -43,7 +54,40 @@ def get_engine() -> Engine:
         )
     
     dsn = f'postgresql+psycopg2://{user}:{password}@{host}:{port}/{dbname}'
-    return sa_create_engine(dsn, pool_pre_ping=True)
+    if dsn not in _engines:
+        _engines[dsn] = sa_create_engine(
+            dsn, pool_pre_ping=True, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW
+        )
+    return _engines[dsn]
+
+
+@contextmanager
+def count_queries(conn) -> Iterator[List[str]]:
+    """Collect the SQL statements a connection sends to the database inside the block.
+
+    Yields a list that fills up as statements run - len() of it after the block is the
+    statement count (Lambda invocations for a Lambda connection). Used by run_etl when
+    ETL_COUNT_QUERIES=true to spot per-row query loops creeping into a table load.
+    COPY streams issued on the raw psycopg2 cursor are not seen.
+    """
+    statements: List[str] = []
+    if hasattr(conn, 'set_statement_log'):
+        # Lambda connection - it records its own invocations
+        conn.set_statement_log(statements)
+        try:
+            yield statements
+        finally:
+            conn.set_statement_log(None)
+        return
+
+    def _record(_conn, _cursor, statement, _parameters, _context, _executemany):
+        statements.append(statement[:200])
+
+    event.listen(conn, 'before_cursor_execute', _record)
+    try:
+        yield statements
+    finally:
+        event.remove(conn, 'before_cursor_execute', _record)
 
 
 def get_primary_keys(conn: Connection, models_module: Optional[Any] = None) -> Dict[str, List[str]]:
@@ -5,11 +5,19 @@ Uses db_query.py Lambda function for all database operations.
 from __future__ import annotations
 
 import os
+import re
 import sys
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Iterator
+from typing import Dict, List, Optional, Any, Iterator, Tuple
 from contextlib import contextmanager
 
+# orjson parses Lambda response bodies several times faster; stdlib json is the fallback
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
 # Import db_query module
 project_root = Path(__file__).parent.parent
 if str(project_root) not in sys.path:
@@ -22,18 +30,65 @@ except ImportError:
         "db_query.py not found. Please ensure db_query.py exists in the project root."
     )
 
+# lambda_debug.log is shared by every connection - writes from concurrent statements must not interleave
+_debug_log_lock = threading.Lock()
+
 
 class LambdaReturningError(Exception):
     """Special exception for RETURNING clause errors that can be retried without RETURNING clause"""
     pass
 
 
+def _rows_affected(envelope) -> Optional[int]:
+    """Read the affected-row count a Lambda response carries ({"rows_affected": n} or {"rowcount": n}), if any."""
+    if not isinstance(envelope, dict):
+        return None
+    for key in ('rows_affected', 'rowcount'):
+        value = envelope.get(key)
+        if isinstance(value, int) and value >= 0:
+            return value
+    return None
+
+
+# :name placeholders - not ::type casts, and not the minutes of a '10:30' literal
+_NAMED_PARAM_RE = re.compile(r"(?<![:\w]):(\w+)")
+
+
+def _bind_named_params(sql: str, params: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """Rewrite :name placeholders to %s and return (sql, positional params) for the Lambda.
+
+    Literal % signs are doubled since the statement is then formatted by the driver - unless
+    nothing was bound, in which case the SQL is returned untouched and sent without params
+    (the driver doesn't format it, so doubled %% would reach Postgres as-is).
+    Values that aren't JSON-native (dates, decimals, ...) are sent as strings.
+    """
+    bound: List[Any] = []
+    
+    def _bind(match):
+        key = match.group(1)
+        if key not in params:
+            return match.group(0)
+        value = params[key]
+        bound.append(value if value is None or isinstance(value, (str, int, float, bool)) else str(value))
+        return "%s"
+    
+    bound_sql = _NAMED_PARAM_RE.sub(_bind, sql.replace("%", "%%"))
+    if not bound:
+        return sql, []
+    return bound_sql, bound
+
+
 class LambdaConnection:
     """Connection-like object that uses Lambda for database operations."""
     
     def __init__(self):
         self._in_transaction = False
         self._transaction_queries = []
+        # Set to a list by etl.db.count_queries() - every Lambda invocation is appended to it
+        self.statement_log: Optional[List[str]] = None
+        # etl.load runs sub-batch retries on one connection from several threads; guards the
+        # per-connection bookkeeping (the Lambda calls themselves are independent)
+        self._lock = threading.Lock()
     
     def execute(self, query, params=None):
         """Execute a SQL query via Lambda."""
@@ -67,20 +122,10 @@ class LambdaConnection:
             if extracted_params:
                 params = extracted_params
             
-            # If params were passed as argument and not extracted from bindparams, use them
-            # Need to manually substitute parameters in SQL string for Lambda
+            # Named parameters (:param_name) are sent to the Lambda as bound %s parameters rather
+            # than escaped and spliced into the SQL text
             if params and isinstance(params, dict):
-                # Simple parameter substitution (for :param_name format)
-                for key, value in params.items():
-                    # Escape single quotes in string values
-                    if isinstance(value, str):
-                        escaped_value = value.replace("'", "''")
-                        sql = sql.replace(f":{key}", f"'{escaped_value}'")
-                    elif value is None:
-                        sql = sql.replace(f":{key}", "NULL")
-                    else:
-                        sql = sql.replace(f":{key}", str(value))
-                params = None  # Clear params since we've substituted them
+                sql, params = _bind_named_params(sql, params)
         
         # For Lambda, execute immediately even in transaction mode
         # (Lambda doesn't support true transactions, so we execute immediately
@@ -88,74 +133,78 @@ class LambdaConnection:
         result = self._execute_query(sql, params)
         
         # Track query for transaction rollback (if needed)
-        if self._in_transaction:
-            self._transaction_queries.append((sql, params))
+        self._track_query(sql)
         
         return result
     
+    def set_statement_log(self, statement_log: Optional[List[str]]):
+        """Start (list) or stop (None) recording Lambda invocations - see etl.db.count_queries()."""
+        with self._lock:
+            self.statement_log = statement_log
+    
+    def _track_query(self, sql: str):
+        """Remember a statement run inside the current transaction (for logging only).
+
+        Only the head of the statement is kept - batched UPSERTs carry megabytes of VALUES
+        text or parameters, and holding every one until commit would pin them all in memory.
+        """
+        with self._lock:
+            if self._in_transaction:
+                self._transaction_queries.append(sql[:200])
+    
     def insert_dataframe(self, table_name: str, df):
         """Insert DataFrame into table via Lambda (replaces pandas to_sql)."""
-        import pandas as pd
-        
         if df.empty:
             return 0
         
-        # Convert DataFrame to INSERT statements
-        # Batch inserts for better performance
-        batch_size = 1000
+        # Imported here - etl.load imports this module
+        from .load import PG_MAX_BIND_PARAMS, _param_rows
+        
+        # Convert DataFrame to INSERT statements with the rows bound as parameters
+        # Batch inserts for better performance (and to stay under the bind-parameter limit)
+        batch_size = max(1, min(1000, PG_MAX_BIND_PARAMS // len(df.columns)))
         rows_inserted = 0
+        columns = ', '.join([f'"{col}"' for col in df.columns])
+        sql_template = f"INSERT INTO {table_name} ({columns}) VALUES %s"
         
         for i in range(0, len(df), batch_size):
             batch_df = df.iloc[i:i+batch_size]
             
-            # Build INSERT statement
-            columns = ', '.join([f'"{col}"' for col in batch_df.columns])
-            values_list = []
-            
-            for _, row in batch_df.iterrows():
-                values = []
-                for val in row:
-                    if pd.isna(val):
-                        values.append('NULL')
-                    elif isinstance(val, str):
-                        # Escape single quotes
-                        escaped_val = val.replace("'", "''")
-                        values.append(f"'{escaped_val}'")
-                    elif isinstance(val, (int, float)):
-                        values.append(str(val))
-                    elif isinstance(val, bool):
-                        values.append('TRUE' if val else 'FALSE')
-                    elif isinstance(val, (pd.Timestamp, pd.DatetimeTZDtype)):
-                        # Handle datetime objects
-                        if pd.notna(val):
-                            values.append(f"'{val.isoformat()}'")
-                        else:
-                            values.append('NULL')
-                    else:
-                        # Convert to string and escape
-                        escaped_val = str(val).replace("'", "''")
-                        values.append(f"'{escaped_val}'")
-                
-                values_list.append(f"({', '.join(values)})")
-            
-            # Build multi-row INSERT
-            values_str = ', '.join(values_list)
-            sql = f"INSERT INTO {table_name} ({columns}) VALUES {values_str}"
-            
             # Execute via Lambda (always execute immediately, even in transaction mode)
-            self._execute_query(sql)
-            
-            # Track for transaction rollback (if needed)
-            if self._in_transaction:
-                self._transaction_queries.append((sql, None))
+            self.insert_values(sql_template, _param_rows(batch_df))
             
             rows_inserted += len(batch_df)
         
         return rows_inserted
     
+    def insert_values(self, sql_template: str, rows):
+        """Execute an INSERT with rows bound as parameters (like psycopg2.extras.execute_values).
+
+        sql_template must contain a single "VALUES %s", which is expanded to one
+        placeholder group per row. Rows are sent to the Lambda as a JSON params
+        array instead of escaped SQL literals. Values must be JSON-serializable.
+        """
+        rows = [list(row) for row in rows]
+        if not rows:
+            return LambdaResult([])
+        
+        row_placeholder = "(" + ", ".join(["%s"] * len(rows[0])) + ")"
+        sql = sql_template.replace("VALUES %s", "VALUES " + ", ".join([row_placeholder] * len(rows)), 1)
+        params = [val for row in rows for val in row]
+        
+        result = self._execute_query(sql, params)
+        
+        # Track for transaction rollback (if needed)
+        self._track_query(sql)
+        
+        return result
+    
     def _execute_query(self, sql: str, params: Optional[Dict] = None):
         """Execute a single query via Lambda."""
         print("DB_LAMBDA_EXECUTING")
+        with self._lock:
+            if self.statement_log is not None:
+                self.statement_log.append(sql[:200])
         try:
             # Convert params dict to list if needed (Lambda might expect list format)
             if params:
@@ -165,7 +214,7 @@ class LambdaConnection:
             else:
                 result = db_query.database_query(sql)
             
-            with open('lambda_debug.log', 'a', encoding='utf-8') as f:
+            with _debug_log_lock, open('lambda_debug.log', 'a', encoding='utf-8') as f:
                 f.write(f"SQL: {sql}\n")
                 f.write(f"Result Type: {type(result)}\n")
                 f.write(f"Result: {result}\n")
@@ -182,7 +231,6 @@ class LambdaConnection:
                 
                 # Handle API Gateway style response (statusCode, body)
                 if 'body' in result and 'statusCode' in result:
-                    import json
                     status_code = result.get('statusCode', 200)
                     
                     # Check for error status codes (500, 400, etc.)
@@ -190,7 +238,7 @@ class LambdaConnection:
                         try:
                             body_data = result['body']
                             if isinstance(body_data, str):
-                                error_data = json.loads(body_data)
+                                error_data = _json.loads(body_data)
                             else:
                                 error_data = body_data
                             
@@ -202,7 +250,9 @@ class LambdaConnection:
                             if 'list index out of range' in error_msg.lower() and 'RETURNING' in sql.upper():
                                 print(f"    [WARNING] Lambda RETURNING clause parsing error (Lambda function limitation): {error_msg[:200]}")
                                 # Raise special exception that caller can catch and retry without RETURNING clause
-                                raise LambdaReturningError(f"Lambda RETURNING clause error: {error_msg}")
+                                error = LambdaReturningError(f"Lambda RETURNING clause error: {error_msg}")
+                                error.rows_affected = _rows_affected(error_data)
+                                raise error
 
                             # REMOVED: Dangerous swallowing of 500 errors
                             # if 'list index out of range' in error_msg.lower():
@@ -210,8 +260,12 @@ class LambdaConnection:
                             #     return LambdaResult([])
                             
                             print(f"    [ERROR] Lambda returned status {status_code} with error: {error_msg[:300]}")
-                            raise RuntimeError(f"Lambda query failed (status {status_code}): {error_msg}")
-                        except json.JSONDecodeError:
+                            # The statement may have run before the Lambda failed reading its result -
+                            # keep the affected-row count if the Lambda reported one
+                            error = RuntimeError(f"Lambda query failed (status {status_code}): {error_msg}")
+                            error.rows_affected = _rows_affected(error_data)
+                            raise error
+                        except _json.JSONDecodeError:
                             # If body is not JSON, use it as error message
                             error_msg = result['body']
                             print(f"    [ERROR] Lambda returned status {status_code} with error: {error_msg[:300]}")
@@ -221,7 +275,7 @@ class LambdaConnection:
                     try:
                         body_data = result['body']
                         if isinstance(body_data, str):
-                            data = json.loads(body_data)
+                            data = _json.loads(body_data)
                         else:
                             data = body_data
                         
@@ -232,18 +286,19 @@ class LambdaConnection:
                             raise RuntimeError(f"Lambda query error: {error_msg}")
                         
                         # If data is list, use it. If dict with 'data', use that.
+                        rowcount = _rows_affected(data)
                         if isinstance(data, dict) and 'data' in data:
                             data = data['data']
                         
                         # Now process 'data' as if it was in the top level
                         if isinstance(data, list):
-                            return LambdaResult(data)
+                            return LambdaResult(data, rowcount)
                         elif data is None:
-                            return LambdaResult([])
+                            return LambdaResult([], rowcount)
                         else:
                             # Single value or other structure
-                            return LambdaResult([data] if not isinstance(data, list) else data)
-                    except json.JSONDecodeError as e:
+                            return LambdaResult([data] if not isinstance(data, list) else data, rowcount)
+                    except _json.JSONDecodeError as e:
                         print(f"    [WARNING] Failed to parse Lambda body: {e}")
                         # Fall through to default handling
                     except LambdaReturningError:
@@ -261,7 +316,7 @@ class LambdaConnection:
                     data = result['data']
                     if data is None:
                         # DDL statements return None - return empty result
-                        return LambdaResult([])
+                        return LambdaResult([], _rows_affected(result))
                     # Debug: log data type and length for UPSERT queries
                     if 'RETURNING' in sql.upper() or 'INSERT' in sql.upper():
                         print(f"    [DEBUG] Lambda returned data type: {type(data)}, length: {len(data) if isinstance(data, (list, tuple)) else 'N/A'}")
@@ -269,7 +324,7 @@ class LambdaConnection:
                             print(f"    [DEBUG] Lambda data sample (first 3): {data[:3]}")
                     # Ensure data is a list, not a method or other callable
                     if isinstance(data, list):
-                        return LambdaResult(data)
+                        return LambdaResult(data, _rows_affected(result))
                     elif callable(data):
                         # Don't accept callable objects as data
                         print(f"    [WARNING] Lambda returned callable object as data, ignoring")
@@ -303,7 +358,9 @@ class LambdaConnection:
             print(f"    [ERROR] Lambda query execution failed: {e}")
             import traceback
             traceback.print_exc()
-            raise RuntimeError(f"Lambda query execution failed: {e}")
+            error = RuntimeError(f"Lambda query execution failed: {e}")
+            error.rows_affected = getattr(e, 'rows_affected', None)
+            raise error
     
     def begin(self):
         """Start a transaction."""
@@ -344,7 +401,9 @@ class LambdaConnection:
 class LambdaResult:
     """Result-like object that mimics SQLAlchemy result."""
     
-    def __init__(self, rows: List):
+    def __init__(self, rows: List, rowcount: Optional[int] = None):
+        # Like SQLAlchemy's CursorResult.rowcount: rows affected by the statement, -1 if the Lambda didn't say
+        self.rowcount = rowcount if rowcount is not None else -1
         # Ensure rows is always a list, never None or a method
         if rows is None:
             self._rows = []
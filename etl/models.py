@@ -15,7 +15,6 @@ class AdminUser(Base):
     __tablename__ = 'admin_user'
     __table_args__ = (
         PrimaryKeyConstraint('id', name='admin_user_pkey'),
-        Index('ix_admin_user_id', 'id'),
         Index('ix_admin_user_username', 'username', unique=True)
     )
 
@@ -328,8 +327,7 @@ class UomMaster(Base):
     __tablename__ = 'uom_master'
     __table_args__ = (
         PrimaryKeyConstraint('uom_id', name='uom_master_pkey'),
-        UniqueConstraint('uom_name', name='uk_uom_name'),
-        UniqueConstraint('uom_name', name='uom_master_uom_name_key')
+        UniqueConstraint('uom_name', name='uk_uom_name')
     )
 
     uom_id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -385,7 +383,8 @@ class CompanyCurrencyExchangeHistory(Base):
         ForeignKeyConstraint(['from_currency'], ['currency_master.currency_name'], name='company_currency_exchange_history_from_currency_fkey'),
         ForeignKeyConstraint(['purchase_org_id'], ['purchasing_organizations.purchasing_org_id'], name='company_currency_exchange_history_purchase_org_id_fkey'),
         ForeignKeyConstraint(['to_currency'], ['currency_master.currency_name'], name='company_currency_exchange_history_to_currency_fkey'),
-        PrimaryKeyConstraint('currency_exchange_purchase_org_id', name='company_currency_exchange_history_pkey')
+        PrimaryKeyConstraint('currency_exchange_purchase_org_id', name='company_currency_exchange_history_pkey'),
+        Index('idx_company_currency_exchange_lookup', 'from_currency', 'to_currency', 'date_from', 'date_to')
     )
 
     currency_exchange_purchase_org_id: Mapped[int] = mapped_column(Integer, Identity(always=True, start=1, increment=1, minvalue=1, maxvalue=2147483647, cycle=False, cache=1), primary_key=True)
@@ -406,7 +405,8 @@ class CountryHsnCodeWiseDutyStructure(Base):
     __table_args__ = (
         ForeignKeyConstraint(['country_of_origin_all_code'], ['country_master.country_code'], name='country_hsn_code_wise_duty_stru_country_of_origin_all_code_fkey'),
         ForeignKeyConstraint(['destination_country_code'], ['country_master.country_code'], name='country_hsn_code_wise_duty_struct_destination_country_code_fkey'),
-        PrimaryKeyConstraint('id', name='country_hsn_code_wise_duty_structure_pkey')
+        PrimaryKeyConstraint('id', name='country_hsn_code_wise_duty_structure_pkey'),
+        Index('idx_duty_lookup', 'destination_country_code', 'country_of_origin_all_code', 'hsn_code', postgresql_include=['net_duty'])
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -439,7 +439,8 @@ class CurrencyExchangeHistory(Base):
     __table_args__ = (
         ForeignKeyConstraint(['from_currency'], ['currency_master.currency_name'], name='currency_exchange_history_from_currency_fkey'),
         ForeignKeyConstraint(['to_currency'], ['currency_master.currency_name'], name='currency_exchange_history_to_currency_fkey'),
-        PrimaryKeyConstraint('currency_exchange_id', name='currency_exchange_history_pkey')
+        PrimaryKeyConstraint('currency_exchange_id', name='currency_exchange_history_pkey'),
+        Index('idx_currency_exchange_lookup', 'from_currency', 'to_currency', 'date_from', 'date_to')
     )
 
     currency_exchange_id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -760,7 +761,6 @@ class DemandSupplySummary(Base):
         PrimaryKeyConstraint('id', name='demand_supply_summary_pkey'),
         UniqueConstraint('material_id', 'location_id', 'summary_date', name='unique_material_location_date'),
         Index('idx_created_at', 'created_at'),
-        Index('idx_material_location', 'material_id', 'location_id'),
         Index('idx_summary_date', 'summary_date')
     )
 
@@ -1096,8 +1096,7 @@ class PriceForecastData(Base):
         ForeignKeyConstraint(['location_id'], ['location_master.location_id'], name='fk_forecast_location'),
         ForeignKeyConstraint(['material_id'], ['material_master.material_id'], name='fk_forecast_material'),
         PrimaryKeyConstraint('forecast_id', name='price_forecast_data_pkey'),
-        UniqueConstraint('material_id', 'location_id', 'model_name', 'forecast_date', name='unique_forecast'),
-        Index('idx_forecast_unique', 'material_id', 'location_id', 'model_name', 'forecast_date')
+        UniqueConstraint('material_id', 'location_id', 'model_name', 'forecast_date', name='unique_forecast')
     )
 
     forecast_id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -169,24 +169,32 @@ def get_table_columns_from_model(model_class: Type[DeclarativeBase]) -> List[str
     return [col.name for col in model_class.__table__.columns]
 
 
-def get_fk_dependency_order(models_module: Any) -> List[str]:
-    """Build topological sort of tables based on FK dependencies.
+def get_fk_dependencies(models_module: Any) -> Dict[str, set]:
+    """Build the FK dependency graph: {table_name: set of tables it references}.
     
-    Returns list of table names in order: tables with no dependencies first,
-    then tables that depend on them, etc.
+    Self-references are ignored (they're handled by database).
     """
     models = get_all_models_from_module(models_module)
     
-    # Build dependency graph: table -> set of tables it depends on
     dependencies = {}
     for table_name, model_class in models.items():
         fks = get_foreign_keys_from_model(model_class)
         deps = set()
         for fk_col, ref_table, ref_col in fks:
-            # Ignore self-references (they're handled by database)
             if ref_table != table_name and ref_table in models:
                 deps.add(ref_table)
         dependencies[table_name] = deps
+    return dependencies
+
+
+def get_fk_dependency_order(models_module: Any) -> List[str]:
+    """Build topological sort of tables based on FK dependencies.
+    
+    Returns list of table names in order: tables with no dependencies first,
+    then tables that depend on them, etc.
+    """
+    models = get_all_models_from_module(models_module)
+    dependencies = get_fk_dependencies(models_module)
     
     # Topological sort using DFS
     sorted_tables = []
@@ -216,3 +224,37 @@ def get_fk_dependency_order(models_module: Any) -> List[str]:
     
     return sorted_tables
 
+
+def get_fk_dependency_layers(models_module: Any, tables: List[str]) -> List[List[str]]:
+    """Group an ordered table list into layers that can be loaded concurrently.
+    
+    Two tables linked by a foreign key (in either direction) always end up in different
+    layers, in the same relative order as in `tables` - so loading the layers one after
+    another gives the same result as loading `tables` serially. Tables in the same layer
+    share no foreign keys with each other.
+    
+    Tables that aren't in the models have unknown foreign keys, so they are loaded alone,
+    after everything listed before them and before everything listed after them.
+    """
+    dependencies = get_fk_dependencies(models_module)
+    related: Dict[str, set] = {t: set(deps) for t, deps in dependencies.items()}
+    for table_name, deps in dependencies.items():
+        for dep in deps:
+            related.setdefault(dep, set()).add(table_name)
+    
+    layer_of: Dict[str, int] = {}
+    layers: List[List[str]] = []
+    first_free = 0  # no table may go into a layer before this one (set by unmodelled tables)
+    for table in tables:
+        if table not in dependencies:
+            layer = len(layers)
+            first_free = layer + 1
+        else:
+            # A table listed twice is also ordered after its own earlier load
+            earlier = [layer_of[t] for t in related[table] | {table} if t in layer_of]
+            layer = max([first_free] + [l + 1 for l in earlier])
+        layer_of[table] = layer
+        if layer == len(layers):
+            layers.append([])
+        layers[layer].append(table)
+    return layers
@@ -2,15 +2,17 @@
 from __future__ import annotations
 
 import argparse
+import logging
 import os
 import sys
 from datetime import datetime
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
 from dotenv import load_dotenv
 
-from etl.db import get_engine, get_primary_keys
+from etl.db import count_queries, get_engine, get_primary_keys
 from etl.schema import ensure_database_schema, get_schema_info
 from etl.extract import read_sheet
 from .transform import (
@@ -26,6 +28,7 @@ from .transform import (
     map_purchasing_org_name_to_id,
 )
 from .load import stage_and_upsert
+from .models_utils import get_fk_dependency_layers
 from .report import RunReporter
 from .notify import send_run_report
 from .utils import download_excel_from_s3, load_yaml
@@ -119,12 +122,255 @@ def resolve_worklist(args: argparse.Namespace, mappings: dict, models_module=Non
     return list(mappings.get("load_order", {}).get(args.category, []))
 
 
+def _resolve_sheet(sheet_name: str, mappings: dict) -> Tuple[str, dict, str]:
+    """Resolve a worklist entry to (sheet_name, mappings config, target_table)."""
+    cfg = mappings.get("tables", {}).get(sheet_name, {})
+    
+    # If sheet_name (from worklist) is not in mappings keys, it might be a target_table name
+    # (e.g. when worklist comes from models.py). Try to find the corresponding sheet name.
+    if not cfg:
+        for s_name, s_cfg in mappings.get("tables", {}).items():
+            if s_cfg.get("target_table") == sheet_name:
+                print(f"  [DEBUG] Mapped table '{sheet_name}' to sheet '{s_name}'")
+                sheet_name = s_name
+                cfg = s_cfg
+                break
+
+    return sheet_name, cfg, cfg.get("target_table", sheet_name)
+
+
+class _OrderedReporter:
+    """Holds one concurrent table load's summary rows until main() replays them in worklist order.
+
+    Worker threads finish in any order; buffering record_table/record_error keeps the run
+    report deterministic. Everything else (write_rejected, paths) goes straight to the reporter.
+    """
+
+    def __init__(self, reporter: RunReporter):
+        self._reporter = reporter
+        self._calls: List[Tuple[str, tuple]] = []
+
+    def record_table(self, *args) -> None:
+        self._calls.append(("record_table", args))
+
+    def record_error(self, *args) -> None:
+        self._calls.append(("record_error", args))
+
+    def replay(self) -> None:
+        for name, args in self._calls:
+            getattr(self._reporter, name)(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._reporter, name)
+
+
+def _load_one(sheet_name: str, cfg: dict, target_table: str, args: argparse.Namespace, tables_conf: dict,
+              pk_map: Dict[str, List[str]], models_module, engine, reporter: RunReporter) -> None:
+    """Read, validate and load one sheet into its target table, recording the outcome on the reporter.
+
+    Runs on a worker thread when tables are loaded concurrently - each call uses its own
+    connection from the engine. Errors are recorded on the reporter, never raised.
+    """
+    print(f"--- Processing sheet: {sheet_name} ---")
+    column_renames: Dict[str, str] = cfg.get("column_renames", {})
+    types_cfg: Dict[str, str] = cfg.get("dtypes", {})
+    incr_cfg = cfg.get("incremental", {"strategy": "business_key_upsert"})
+
+    try:
+        # Try to read sheet - first try the sheet_name from mappings, then try target_table
+        # This handles cases where Excel has database table names as sheet names
+        print(f"Reading sheet {sheet_name} from {args.excel}")
+        df = None
+        sheet_found = False
+        try:
+            df = read_sheet(args.excel, sheet_name)
+            sheet_found = True
+            print(f"  Found sheet as '{sheet_name}'")
+        except ValueError as e1:
+            # Sheet not found with mappings name - try target_table name
+            # This handles Excel files exported from database (which use table names as sheet names)
+            if target_table != sheet_name:
+                try:
+                    print(f"  Sheet '{sheet_name}' not found, trying target_table name '{target_table}'...")
+                    df = read_sheet(args.excel, target_table)
+                    sheet_found = True
+                    print(f"  Found sheet as '{target_table}'")
+                except ValueError as e2:
+                    # Neither name found - log and continue
+                    error_msg = f"Sheet not found: tried '{sheet_name}' and '{target_table}'. Available sheets shown in error."
+                    print(f"ERROR loading {target_table}: {error_msg}")
+                    print(f"  First error: {str(e1)[:200]}")
+                    reporter.record_error(sheet_name, target_table, error_msg)
+                    return
+            else:
+                # Same name, so just report the error
+                error_msg = str(e1)
+                print(f"ERROR loading {target_table}: {error_msg}")
+                reporter.record_error(sheet_name, target_table, error_msg)
+                return
+        
+        if not sheet_found or df is None:
+            error_msg = f"Could not read sheet for {target_table}"
+            print(f"ERROR loading {target_table}: {error_msg}")
+            reporter.record_error(sheet_name, target_table, error_msg)
+            return
+        df = clean_dataframe(df)
+        if column_renames:
+            df = apply_column_renames(df, column_renames)
+
+        # Determine PK/keys
+        table_pk = tables_conf.get(target_table, {}).get("primary_key") or pk_map.get(target_table)
+        if not table_pk:
+            raise RuntimeError(f"No primary key configured/found for table {target_table}")
+
+        # Table-specific transforms
+        if target_table == 'material_master':
+            # Map material_type text to material_type_id using Material_Type_Master sheet
+            df = map_material_type_desc_to_id(df, args.excel)
+        elif target_table == 'location_master':
+            # Map location_Type text to location_type_id using Location_Type_Master sheet
+            df = map_location_type_desc_to_id(df, args.excel)
+        elif target_table == 'plant_material_purchase_org_supplier':
+            # Map purchasing org names/descs to IDs (e.g., "Global" -> 1)
+            df = map_purchasing_org_name_to_id(df, args.excel)
+
+        # Apply JSON transformations for specific tables
+        df = apply_json_transforms(df, target_table)
+
+        # Apply UoM conversion transformations for uom_conversion table
+        if target_table == 'uom_conversion':
+            df = apply_uom_conversion_transforms(df)
+
+        # Auto-generate missing primary keys where applicable
+        df = auto_generate_missing_keys(df, table_pk, target_table)
+
+        # Log initial row count
+        initial_row_count = len(df)
+        print(f"  [DEBUG] Initial rows read from Excel: {initial_row_count}")
+        
+        # Split rows with valid vs missing primary keys
+        df, pk_invalid, pk_reasons = split_valid_invalid(df, table_pk)
+        print(f"  [DEBUG] After PK validation: {len(df)} valid, {len(pk_invalid)} rejected (missing PK)")
+        
+        # Type coercion for valid rows
+        df, type_invalid, type_reasons = coerce_types_for_table(df, types_cfg)
+        print(f"  [DEBUG] After type coercion: {len(df)} valid, {len(type_invalid)} rejected (type errors)")
+        
+        # Combine all rejected rows and reasons
+        rejected = pd.concat([pk_invalid, type_invalid], ignore_index=True) if not pk_invalid.empty or not type_invalid.empty else pd.DataFrame()
+        reasons = pk_reasons + type_reasons
+
+        # Deduplicate on primary key(s) to avoid ON CONFLICT affecting same row twice
+        if table_pk and not df.empty:
+            before = len(df)
+            df = df.drop_duplicates(subset=table_pk, keep='last')
+            after = len(df)
+            if after < before:
+                reasons.append(f"Deduplicated {before - after} duplicate rows on keys {table_pk}")
+                print(f"  [DEBUG] After deduplication: {after} rows (removed {before - after} duplicates)")
+
+        print(f"  [DEBUG] Rows ready for database: {len(df)} (rejected so far: {len(rejected)})")
+        
+        inserted = updated = 0
+        fk_rejected = 0
+        fk_rejected_df = pd.DataFrame()
+        if args.dry_run:
+            print(f"  [DEBUG] DRY RUN mode - skipping database operations")
+        else:
+            with engine.begin() as conn:
+                replace = args.mode == 'initial'
+                print(f"  [DEBUG] Mode: {'REPLACE' if replace else 'UPSERT'}")
+                # ALWAYS allow FK violations for all tables - filter and reject invalid rows instead of failing
+                # This prevents the entire load from failing due to a few bad rows
+                allow_fk = True
+                # ETL_COUNT_QUERIES=true prints the statements (Lambda invocations) each load issued - a
+                # count that grows with the row count rather than the batch count means a per-row query loop
+                if os.getenv("ETL_COUNT_QUERIES", "false").lower() == "true":
+                    with count_queries(conn) as statements:
+                        inserted, updated, fk_rejected, fk_rejected_df = stage_and_upsert(conn, target_table, df, table_pk, replace=replace, allow_fk_violations=allow_fk, models_module=models_module)
+                    print(f"  [DEBUG] SQL statements issued: {len(statements)}")
+                else:
+                    inserted, updated, fk_rejected, fk_rejected_df = stage_and_upsert(conn, target_table, df, table_pk, replace=replace, allow_fk_violations=allow_fk, models_module=models_module)
+                print(f"  [DEBUG] Database operation result: inserted={inserted}, updated={updated}, fk_rejected={fk_rejected}")
+
+        total_rejected = len(rejected) + fk_rejected
+        # Add FK rejection reasons to the reasons list
+        if fk_rejected > 0:
+            fk_reason = f"{fk_rejected} rows rejected due to missing foreign key references"
+            reasons.append(fk_reason)
+        
+        # Number of rows that were valid after all validations (and sent to DB)
+        valid_rows_for_db = len(df)
+        
+        # If nothing was inserted/updated/rejected but we did read valid rows,
+        # make that explicit in the report notes so business users understand
+        # this was effectively a no-op (data already present/unchanged).
+        if inserted == 0 and updated == 0 and total_rejected == 0 and initial_row_count > 0 and valid_rows_for_db > 0:
+            reasons.append(
+                "No rows were inserted or updated because all rows already exist in the database with the same keys/data "
+                "(idempotent load – database was already in sync with Excel)."
+            )
+        
+        reporter.record_table(
+            sheet_name,
+            target_table,
+            initial_row_count,      # rows read from Excel
+            valid_rows_for_db,      # rows that passed validation and were sent to DB
+            total_rejected,         # total rejected (data + FK)
+            inserted,
+            updated,
+            reasons,
+        )
+        
+        # Write both types of rejected rows to CSV
+        reporter.write_rejected(sheet_name, rejected)
+        if not fk_rejected_df.empty:
+            reporter.write_rejected(f"{sheet_name}_fk_violations", fk_rejected_df)
+        
+        print(f"Loaded {target_table}: inserted={inserted}, updated={updated}, rejected={total_rejected} (data issues: {len(rejected)}, FK violations: {fk_rejected})")
+        if inserted == 0 and updated == 0 and total_rejected == 0 and initial_row_count > 0:
+            print(f"  [WARNING] No rows inserted/updated/rejected but {initial_row_count} rows were read - data may already exist in database")
+
+    except Exception as e:
+        error_str = str(e)
+        import traceback
+        print(f"    [CRITICAL ERROR] Exception while processing {target_table}:")
+        traceback.print_exc()
+        
+        # Check if it's a FK violation - this should not happen if FK filtering is working
+        if "ForeignKeyViolation" in error_str or "foreign key constraint" in error_str.lower():
+            print(f"WARNING: Foreign key violation for {target_table} (FK filtering should have prevented this).")
+            print(f"  Error: {error_str[:300]}")
+            # Try to extract which FK failed for better reporting
+            import re
+            fk_match = re.search(r'Key \(([^)]+)\)=\(([^)]+)\) is not present in table "([^"]+)"', error_str)
+            if fk_match:
+                column, value, ref_table = fk_match.groups()
+                error_msg = f"Foreign key violation: {column}={value} not found in {ref_table}. "
+                error_msg += f"Please ensure reference data exists in {ref_table} table first. "
+                error_msg += f"(This should have been filtered out - please report this as a bug)"
+                reporter.record_error(sheet_name, target_table, error_msg)
+            else:
+                reporter.record_error(sheet_name, target_table, error_str)
+        elif "Worksheet named" in error_str and "not found" in error_str:
+            # Sheet not found - already handled above, but catch here too
+            reporter.record_error(sheet_name, target_table, error_str)
+            print(f"ERROR loading {target_table}: {error_str}")
+        else:
+            # Other errors - log and continue
+            reporter.record_error(sheet_name, target_table, error_str)
+            print(f"ERROR loading {target_table}: {error_str[:500]}")
+
 
 def main(argv: list[str] | None = None):
     """Entry point for ETL. Accepts sys.argv style list for programmatic use."""
     load_dotenv()  # .env optional
     args = parse_args() if argv is None else parse_args_from(argv)
 
+    # Log output from etl.* modules (set ETL_LOG_LEVEL=DEBUG for FK filtering details)
+    logging.basicConfig(format="%(message)s")
+    logging.getLogger("etl").setLevel(os.getenv("ETL_LOG_LEVEL", "INFO").upper())
+
     print(f"[ETL] Starting run with mode={args.mode}, excel={args.excel}")
 
     # Load models if provided, otherwise use YAML
@@ -212,208 +458,46 @@ def main(argv: list[str] | None = None):
         # Ensure we can introspect PKs (use models if available)
         pk_map = get_primary_keys(conn, models_module)
 
-    # Process each sheet in the worklist
-    for sheet_name in worklist:
-        print(f"--- Processing sheet: {sheet_name} ---")
-        cfg = mappings.get("tables", {}).get(sheet_name, {})
-        
-        # If sheet_name (from worklist) is not in mappings keys, it might be a target_table name
-        # (e.g. when worklist comes from models.py). Try to find the corresponding sheet name.
-        if not cfg:
-            for s_name, s_cfg in mappings.get("tables", {}).items():
-                if s_cfg.get("target_table") == sheet_name:
-                    print(f"  [DEBUG] Mapped table '{sheet_name}' to sheet '{s_name}'")
-                    sheet_name = s_name
-                    cfg = s_cfg
-                    break
-
-        target_table = cfg.get("target_table", sheet_name)
-        column_renames: Dict[str, str] = cfg.get("column_renames", {})
-        types_cfg: Dict[str, str] = cfg.get("dtypes", {})
-        incr_cfg = cfg.get("incremental", {"strategy": "business_key_upsert"})
-
-        try:
-            if args.excel.startswith("s3://"):
-                _, _, bucket, *key_parts = args.excel.split("/")
-                key = "/".join(key_parts)
-                args.excel = download_excel_from_s3(bucket, key)
-            
-            # Try to read sheet - first try the sheet_name from mappings, then try target_table
-            # This handles cases where Excel has database table names as sheet names
-            print(f"Reading sheet {sheet_name} from {args.excel}")
-            df = None
-            sheet_found = False
-            try:
-                df = read_sheet(args.excel, sheet_name)
-                sheet_found = True
-                print(f"  Found sheet as '{sheet_name}'")
-            except ValueError as e1:
-                # Sheet not found with mappings name - try target_table name
-                # This handles Excel files exported from database (which use table names as sheet names)
-                if target_table != sheet_name:
-                    try:
-                        print(f"  Sheet '{sheet_name}' not found, trying target_table name '{target_table}'...")
-                        df = read_sheet(args.excel, target_table)
-                        sheet_found = True
-                        print(f"  Found sheet as '{target_table}'")
-                    except ValueError as e2:
-                        # Neither name found - log and continue
-                        error_msg = f"Sheet not found: tried '{sheet_name}' and '{target_table}'. Available sheets shown in error."
-                        print(f"ERROR loading {target_table}: {error_msg}")
-                        print(f"  First error: {str(e1)[:200]}")
-                        reporter.record_error(sheet_name, target_table, error_msg)
-                        continue
-                else:
-                    # Same name, so just report the error
-                    error_msg = str(e1)
-                    print(f"ERROR loading {target_table}: {error_msg}")
-                    reporter.record_error(sheet_name, target_table, error_msg)
-                    continue
-            
-            if not sheet_found or df is None:
-                error_msg = f"Could not read sheet for {target_table}"
-                print(f"ERROR loading {target_table}: {error_msg}")
-                reporter.record_error(sheet_name, target_table, error_msg)
-                continue
-            df = clean_dataframe(df)
-            if column_renames:
-                df = apply_column_renames(df, column_renames)
-
-            # Determine PK/keys
-            table_pk = tables_conf.get(target_table, {}).get("primary_key") or pk_map.get(target_table)
-            if not table_pk:
-                raise RuntimeError(f"No primary key configured/found for table {target_table}")
-
-            # Table-specific transforms
-            if target_table == 'material_master':
-                # Map material_type text to material_type_id using Material_Type_Master sheet
-                df = map_material_type_desc_to_id(df, args.excel)
-            elif target_table == 'location_master':
-                # Map location_Type text to location_type_id using Location_Type_Master sheet
-                df = map_location_type_desc_to_id(df, args.excel)
-            elif target_table == 'plant_material_purchase_org_supplier':
-                # Map purchasing org names/descs to IDs (e.g., "Global" -> 1)
-                df = map_purchasing_org_name_to_id(df, args.excel)
-
-            # Apply JSON transformations for specific tables
-            df = apply_json_transforms(df, target_table)
-
-            # Apply UoM conversion transformations for uom_conversion table
-            if target_table == 'uom_conversion':
-                df = apply_uom_conversion_transforms(df)
-
-            # Auto-generate missing primary keys where applicable
-            df = auto_generate_missing_keys(df, table_pk, target_table)
-
-            # Log initial row count
-            initial_row_count = len(df)
-            print(f"  [DEBUG] Initial rows read from Excel: {initial_row_count}")
-            
-            # Split rows with valid vs missing primary keys
-            df, pk_invalid, pk_reasons = split_valid_invalid(df, table_pk)
-            print(f"  [DEBUG] After PK validation: {len(df)} valid, {len(pk_invalid)} rejected (missing PK)")
-            
-            # Type coercion for valid rows
-            df, type_invalid, type_reasons = coerce_types_for_table(df, types_cfg)
-            print(f"  [DEBUG] After type coercion: {len(df)} valid, {len(type_invalid)} rejected (type errors)")
-            
-            # Combine all rejected rows and reasons
-            rejected = pd.concat([pk_invalid, type_invalid], ignore_index=True) if not pk_invalid.empty or not type_invalid.empty else pd.DataFrame()
-            reasons = pk_reasons + type_reasons
-
-            # Deduplicate on primary key(s) to avoid ON CONFLICT affecting same row twice
-            if table_pk and not df.empty:
-                before = len(df)
-                df = df.drop_duplicates(subset=table_pk, keep='last')
-                after = len(df)
-                if after < before:
-                    reasons.append(f"Deduplicated {before - after} duplicate rows on keys {table_pk}")
-                    print(f"  [DEBUG] After deduplication: {after} rows (removed {before - after} duplicates)")
-
-            print(f"  [DEBUG] Rows ready for database: {len(df)} (rejected so far: {len(rejected)})")
-            
-            inserted = updated = 0
-            fk_rejected = 0
-            fk_rejected_df = pd.DataFrame()
-            if args.dry_run:
-                print(f"  [DEBUG] DRY RUN mode - skipping database operations")
-            else:
-                with engine.begin() as conn:
-                    replace = args.mode == 'initial'
-                    print(f"  [DEBUG] Mode: {'REPLACE' if replace else 'UPSERT'}")
-                    # ALWAYS allow FK violations for all tables - filter and reject invalid rows instead of failing
-                    # This prevents the entire load from failing due to a few bad rows
-                    allow_fk = True
-                    inserted, updated, fk_rejected, fk_rejected_df = stage_and_upsert(conn, target_table, df, table_pk, replace=replace, allow_fk_violations=allow_fk, models_module=models_module)
-                    print(f"  [DEBUG] Database operation result: inserted={inserted}, updated={updated}, fk_rejected={fk_rejected}")
-
-            total_rejected = len(rejected) + fk_rejected
-            # Add FK rejection reasons to the reasons list
-            if fk_rejected > 0:
-                fk_reason = f"{fk_rejected} rows rejected due to missing foreign key references"
-                reasons.append(fk_reason)
-            
-            # Number of rows that were valid after all validations (and sent to DB)
-            valid_rows_for_db = len(df)
-            
-            # If nothing was inserted/updated/rejected but we did read valid rows,
-            # make that explicit in the report notes so business users understand
-            # this was effectively a no-op (data already present/unchanged).
-            if inserted == 0 and updated == 0 and total_rejected == 0 and initial_row_count > 0 and valid_rows_for_db > 0:
-                reasons.append(
-                    "No rows were inserted or updated because all rows already exist in the database with the same keys/data "
-                    "(idempotent load – database was already in sync with Excel)."
-                )
-            
-            reporter.record_table(
-                sheet_name,
-                target_table,
-                initial_row_count,      # rows read from Excel
-                valid_rows_for_db,      # rows that passed validation and were sent to DB
-                total_rejected,         # total rejected (data + FK)
-                inserted,
-                updated,
-                reasons,
-            )
-            
-            # Write both types of rejected rows to CSV
-            reporter.write_rejected(sheet_name, rejected)
-            if not fk_rejected_df.empty:
-                reporter.write_rejected(f"{sheet_name}_fk_violations", fk_rejected_df)
-            
-            print(f"Loaded {target_table}: inserted={inserted}, updated={updated}, rejected={total_rejected} (data issues: {len(rejected)}, FK violations: {fk_rejected})")
-            if inserted == 0 and updated == 0 and total_rejected == 0 and initial_row_count > 0:
-                print(f"  [WARNING] No rows inserted/updated/rejected but {initial_row_count} rows were read - data may already exist in database")
-
-        except Exception as e:
-            error_str = str(e)
-            import traceback
-            print(f"    [CRITICAL ERROR] Exception while processing {target_table}:")
-            traceback.print_exc()
-            
-            # Check if it's a FK violation - this should not happen if FK filtering is working
-            if "ForeignKeyViolation" in error_str or "foreign key constraint" in error_str.lower():
-                print(f"WARNING: Foreign key violation for {target_table} (FK filtering should have prevented this).")
-                print(f"  Error: {error_str[:300]}")
-                # Try to extract which FK failed for better reporting
-                import re
-                fk_match = re.search(r'Key \(([^)]+)\)=\(([^)]+)\) is not present in table "([^"]+)"', error_str)
-                if fk_match:
-                    column, value, ref_table = fk_match.groups()
-                    error_msg = f"Foreign key violation: {column}={value} not found in {ref_table}. "
-                    error_msg += f"Please ensure reference data exists in {ref_table} table first. "
-                    error_msg += f"(This should have been filtered out - please report this as a bug)"
-                    reporter.record_error(sheet_name, target_table, error_msg)
-                else:
-                    reporter.record_error(sheet_name, target_table, error_str)
-            elif "Worksheet named" in error_str and "not found" in error_str:
-                # Sheet not found - already handled above, but catch here too
-                reporter.record_error(sheet_name, target_table, error_str)
-                print(f"ERROR loading {target_table}: {error_str}")
-            else:
-                # Other errors - log and continue
-                reporter.record_error(sheet_name, target_table, error_str)
-                print(f"ERROR loading {target_table}: {error_str[:500]}")
+    # Download the workbook once, before any worker reads from it
+    if args.excel.startswith("s3://"):
+        _, _, bucket, *key_parts = args.excel.split("/")
+        key = "/".join(key_parts)
+        args.excel = download_excel_from_s3(bucket, key)
+
+    # Process each sheet in the worklist. With ETL_MAX_WORKERS > 1, tables that share no foreign
+    # keys are loaded concurrently, one FK layer at a time (one pooled connection per worker);
+    # layers run in order so parents are always loaded before their children.
+    resolved = [_resolve_sheet(sheet_name, mappings) for sheet_name in worklist]
+    # A table can appear more than once (two sheets, same target) - its entries land in successive layers
+    jobs: Dict[str, List[Tuple[str, dict, str]]] = {}
+    for job in resolved:
+        jobs.setdefault(job[2], []).append(job)
+    layers = get_fk_dependency_layers(models_module, [job[2] for job in resolved])
+    # Concurrency is opt-in: the load path still prints untagged progress lines, which interleave
+    # across workers, and every concurrent sheet holds its frames in memory at the same time
+    max_workers = int(os.getenv("ETL_MAX_WORKERS", "1"))
+    if max_workers <= 1:
+        # Serial: plain worklist order
+        print(f"[ETL] Loading {len(worklist)} tables serially")
+        layers = [[job[2]] for job in resolved]
+    else:
+        print(f"[ETL] Loading {len(worklist)} tables in {len(layers)} FK layers (up to {max_workers} concurrently)")
+
+    for layer in layers:
+        if len(layer) == 1:
+            for table in layer:
+                _load_one(*jobs[table].pop(0), args, tables_conf, pk_map, models_module, engine, reporter)
+            continue
+        # Summary rows are recorded in worklist order once each load finishes, not in completion order
+        ordered = [_OrderedReporter(reporter) for _ in layer]
+        with ThreadPoolExecutor(max_workers=min(len(layer), max_workers)) as pool:
+            futures = [
+                pool.submit(_load_one, *jobs[table].pop(0), args, tables_conf, pk_map, models_module, engine, job_reporter)
+                for table, job_reporter in zip(layer, ordered)
+            ]
+            for future, job_reporter in zip(futures, ordered):
+                future.result()
+                job_reporter.replay()
 
     # Finalize reporting
     reporter.finalize()
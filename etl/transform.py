@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from datetime import date
 from typing import Dict, List, Tuple
 
+import numpy as np
 import pandas as pd
 import json
 from pandas import ExcelFile
@@ -66,19 +68,21 @@ def split_valid_invalid(df: pd.DataFrame, pk_cols: List[str]) -> Tuple[pd.DataFr
     if df.empty:
         return df, df.iloc[0:0], []
     
-    # Check for missing primary keys
-    valid_mask = True
-    for col in pk_cols:
-        if col in df.columns:
-            valid_mask = valid_mask & df[col].notna() & (df[col] != "") & (df[col] != "nan")
+    # Check for missing primary keys - one null/blank mask per key column, computed once
+    key_cols = [col for col in pk_cols if col in df.columns]
+    missing = pd.DataFrame(
+        {col: df[col].isna() | (df[col] == "") | (df[col] == "nan") for col in key_cols},
+        index=df.index,
+    )
+    valid_mask = ~missing.any(axis=1)
     
     valid_df = df[valid_mask].copy()
     invalid_df = df[~valid_mask].copy()
     
     reasons = []
     rejection_reasons = []
-    for idx in invalid_df.index:
-        missing_cols = [col for col in pk_cols if col in df.columns and (pd.isna(df.loc[idx, col]) or df.loc[idx, col] in ("", "nan"))]
+    for idx, row_missing in zip(invalid_df.index, missing[~valid_mask].to_numpy()):
+        missing_cols = [col for col, is_missing in zip(key_cols, row_missing) if is_missing]
         if missing_cols:
             reason = f"Missing required data in columns: {missing_cols}"
             reasons.append(f"{reason} (Row {idx})")
@@ -122,32 +126,36 @@ def apply_uom_conversion_transforms(df: pd.DataFrame) -> pd.DataFrame:
     if 'syn' not in df.columns:
         df['syn'] = None
     
-    def process_conversion_factor(row):
-        factor = str(row['conversion_factor']).strip()
+    def process_conversion_factor(factor):
+        """Return (conversion_factor, syn) for one raw factor; syn is None when the factor is numeric."""
+        factor = str(factor).strip()
         
         # Check if it's a formula/special text (contains letters or special chars beyond numbers and decimal)
         if any(char in factor for char in ['=', '°', '×', '÷', '(', ')', '+', '-', 'K', 'C', 'F']) or \
            any(word in factor for word in ['Depends', 'Varies', 'substance', 'pack', 'box']):
             # Move to syn column and set conversion_factor to 0 (NOT NULL constraint)
-            row['syn'] = factor
-            row['conversion_factor'] = 0.0
-        else:
-            # Try to clean numeric values
-            try:
-                # Handle scientific notation variations
-                factor_clean = factor.replace('×', 'e').replace('⁻', '-').replace(' - 10', 'e-')
-                # Try to convert to float to validate it's numeric
-                float(factor_clean)
-                row['conversion_factor'] = factor_clean
-            except ValueError:
-                # If can't convert to number, move to syn
-                row['syn'] = factor
-                row['conversion_factor'] = 0.0
-        
-        return row
+            return 0.0, factor
+        # Try to clean numeric values
+        try:
+            # Handle scientific notation variations
+            factor_clean = factor.replace('×', 'e').replace('⁻', '-').replace(' - 10', 'e-')
+            # Try to convert to float to validate it's numeric
+            float(factor_clean)
+            return factor_clean, None
+        except ValueError:
+            # If can't convert to number, move to syn
+            return 0.0, factor
     
-    # Apply the transformation
-    df = df.apply(process_conversion_factor, axis=1)
+    # Apply the transformation column-wise - df.apply(axis=1) would box every row into a Series
+    factors = []
+    syns = []
+    for raw, syn in zip(df['conversion_factor'].tolist(), df['syn'].tolist()):
+        factor, new_syn = process_conversion_factor(raw)
+        factors.append(factor)
+        syns.append(syn if new_syn is None else new_syn)
+    df = df.copy()
+    df['conversion_factor'] = factors
+    df['syn'] = syns
     
     return df
 
@@ -297,83 +305,123 @@ def map_location_type_desc_to_id(df: pd.DataFrame, excel_path: str) -> pd.DataFr
         return df
 
 
-def coerce_types_for_table(df: pd.DataFrame, types_cfg: Dict[str, str]) -> Tuple[pd.DataFrame, pd.DataFrame, List[str]]:
-    ok_rows = []
-    rej_rows = []
-    rej_reasons = []
-    reasons: List[str] = []
-    for idx, row in df.iterrows():
-        rec = row.to_dict()
+def _coerce_value(val, want: str):
+    """Coerce one cell to the configured type ('int', 'float', 'dict', 'date', else str). Raises on bad values."""
+    # Handle empty/null values
+    if val in (None, "", "nan", "NaN") or pd.isna(val):
+        return None
+    if want == 'int':
+        # Handle float values from Excel (e.g., 9.0 -> 9)
+        val_str = str(val).replace(",", "").strip()
+        # Try converting to float first, then int (handles "9.0" case)
+        return int(float(val_str))
+    elif want == 'float':
+        return float(str(val).replace(",", ""))
+    elif want == 'dict':
+        # Handle JSON/dict types - if already a dict, convert to JSON string
+        # If it's already a JSON string, keep it as is
+        if isinstance(val, dict):
+            return json.dumps(val)
+        elif isinstance(val, str):
+            # If it's already a JSON string, validate it
+            try:
+                json.loads(val)  # Validate JSON
+                return val
+            except (json.JSONDecodeError, TypeError):
+                # If not valid JSON, try to parse as comma-separated and convert
+                return convert_to_json_array(val)
+        else:
+            return convert_to_json_array(str(val))
+    elif want == 'date':
+        # Handle extreme dates that cause overflow
         try:
-            for col, want in types_cfg.items():
-                if col not in rec:
-                    continue
-                val = rec[col]
-                # Handle empty/null values
-                if val in (None, "", "nan", "NaN") or pd.isna(val):
-                    rec[col] = None
-                    continue
-                if want == 'int':
-                    # Handle float values from Excel (e.g., 9.0 -> 9)
-                    val_str = str(val).replace(",", "").strip()
-                    # Try converting to float first, then int (handles "9.0" case)
-                    rec[col] = int(float(val_str))
-                elif want == 'float':
-                    rec[col] = float(str(val).replace(",", ""))
-                elif want == 'dict':
-                    # Handle JSON/dict types - if already a dict, convert to JSON string
-                    # If it's already a JSON string, keep it as is
-                    if isinstance(val, dict):
-                        rec[col] = json.dumps(val)
-                    elif isinstance(val, str):
-                        # If it's already a JSON string, validate it
-                        try:
-                            json.loads(val)  # Validate JSON
-                            rec[col] = val
-                        except (json.JSONDecodeError, TypeError):
-                            # If not valid JSON, try to parse as comma-separated and convert
-                            rec[col] = convert_to_json_array(val)
-                    else:
-                        rec[col] = convert_to_json_array(str(val))
-                elif want == 'date':
-                    # Handle extreme dates that cause overflow
-                    try:
-                        # Special handling for 9999-12-31 (common "end of time" value)
-                        if isinstance(val, str) and '9999-12-31' in val:
-                            # Create a date object directly for 9999-12-31
-                            from datetime import date
-                            rec[col] = date(9999, 12, 31)
-                        elif hasattr(val, 'year') and val.year == 9999:
-                            # Handle datetime objects with year 9999
-                            from datetime import date
-                            rec[col] = date(val.year, val.month, val.day)
-                        else:
-                            parsed_date = pd.to_datetime(val)
-                            # Check for extreme dates (beyond pandas limits)
-                            if parsed_date.year > 2200:
-                                rec[col] = None  # Set extreme dates to NULL
-                            else:
-                                rec[col] = parsed_date.date()
-                    except (pd.errors.OutOfBoundsDatetime, ValueError):
-                        # Try to handle 9999 dates manually
-                        if hasattr(val, 'year') and val.year == 9999:
-                            from datetime import date
-                            rec[col] = date(val.year, val.month, val.day)
-                        else:
-                            rec[col] = None  # Set invalid dates to NULL
-                else:
-                    rec[col] = str(val)
-            ok_rows.append(rec)
+            # Special handling for 9999-12-31 (common "end of time" value)
+            if isinstance(val, str) and '9999-12-31' in val:
+                # Create a date object directly for 9999-12-31
+                return date(9999, 12, 31)
+            elif hasattr(val, 'year') and val.year == 9999:
+                # Handle datetime objects with year 9999
+                return date(val.year, val.month, val.day)
+            else:
+                parsed_date = pd.to_datetime(val)
+                # Check for extreme dates (beyond pandas limits)
+                if parsed_date.year > 2200:
+                    return None  # Set extreme dates to NULL
+                return parsed_date.date()
+        except (pd.errors.OutOfBoundsDatetime, ValueError):
+            # Try to handle 9999 dates manually
+            if hasattr(val, 'year') and val.year == 9999:
+                return date(val.year, val.month, val.day)
+            return None  # Set invalid dates to NULL
+    else:
+        return str(val)
+
+
+def _coerce_column(s: pd.Series, want: str) -> Tuple[list, Dict[int, str]]:
+    """Coerce a whole column; returns (values, {row position: error message}) for the rows that failed."""
+    # Plain numeric columns need no per-cell parsing for int/float targets
+    if want in ('int', 'float') and pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype):
+        arr = s.to_numpy(dtype=np.float64, na_value=np.nan)
+        if not np.isinf(arr).any():
+            if want == 'int':
+                arr = np.trunc(arr)
+            values = arr.tolist()
+            if want == 'int':
+                values = [None if v != v else int(v) for v in values]
+            else:
+                values = [None if v != v else v for v in values]
+            return values, {}
+
+    values = s.tolist()
+    errors: Dict[int, str] = {}
+    for i, val in enumerate(values):
+        try:
+            values[i] = _coerce_value(val, want)
         except Exception as e:
-            rej_rows.append(row)
-            error_msg = str(e)
-            reason = f"Type coercion failed: {error_msg}"
-            rej_reasons.append(reason)
+            errors[i] = str(e)
+    return values, errors
+
+
+def coerce_types_for_table(df: pd.DataFrame, types_cfg: Dict[str, str]) -> Tuple[pd.DataFrame, pd.DataFrame, List[str]]:
+    """Coerce configured columns to their types; rows with a value that can't be coerced are rejected.
+
+    Works column by column (one pass per typed column) instead of over iterrows(). A rejected
+    row's reason is the first failing column in types_cfg order.
+    """
+    reasons: List[str] = []
+    if df.empty:
+        return df.iloc[0:0], df.iloc[0:0], reasons
+
+    coerced: Dict[str, list] = {}
+    first_error: Dict[int, str] = {}  # row position -> error message
+    for col, want in types_cfg.items():
+        if col not in df.columns:
+            continue
+        values, errors = _coerce_column(df[col], want)
+        coerced[col] = values
+        for pos, error_msg in errors.items():
+            first_error.setdefault(pos, error_msg)
+
+    failed = np.zeros(len(df), dtype=bool)
+    failed[list(first_error)] = True
+    ok_positions = np.flatnonzero(~failed)
+
+    if len(ok_positions):
+        # Typed columns are rebuilt from Python values so pandas re-infers their dtype (e.g. int + None -> float)
+        ok_df = pd.DataFrame({
+            col: ([coerced[col][i] for i in ok_positions] if col in coerced else df[col].to_numpy()[ok_positions])
+            for col in df.columns
+        })
+    else:
+        ok_df = df.iloc[0:0]
+
+    rej_df = df.iloc[np.flatnonzero(failed)]
+    if not rej_df.empty:
+        rej_reasons = []
+        for pos, idx in zip(np.flatnonzero(failed), rej_df.index):
+            error_msg = first_error[pos]
+            rej_reasons.append(f"Type coercion failed: {error_msg}")
             reasons.append(f"Type coercion failed for row {idx}: {error_msg}")
-    ok_df = pd.DataFrame(ok_rows) if ok_rows else df.iloc[0:0]
-    rej_df = pd.DataFrame(rej_rows) if rej_rows else df.iloc[0:0]
-    # Add rejection_reason column to rej_df
-    if not rej_df.empty and rej_reasons:
         rej_df = rej_df.copy()
         rej_df['rejection_reason'] = rej_reasons
-    return ok_df, rej_df, reasons
\ No newline at end of file
+    return ok_df, rej_df, reasons
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Generate the FK catalog (etl/config/fk_constraints.json) from SQLAlchemy models.
+
+The ETL uses this catalog as a fallback for FK pre-filtering when foreign keys
+can't be read from information_schema. Re-run this script after changing
+foreign keys in etl/models.py.
+
+Usage:
+    python scripts/generate_fk_catalog.py --models-path etl/models.py --output etl/config/fk_constraints.json
+"""
+import argparse
+import json
+from pathlib import Path
+import sys
+
+# Add parent directory to path to import etl module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from etl.models_loader import load_models_module
+
+
+def generate_fk_catalog(models_path: str, output_path: str):
+    """
+    Write {table_name: [[fk_column, referenced_table, referenced_column], ...]} to a JSON file.
+
+    Args:
+        models_path: Path to models.py file
+        output_path: Path to output JSON file
+    """
+    print(f"[LOAD] Loading models from: {models_path}")
+    models_module = load_models_module(models_path)
+
+    # Use metadata (not just mapped classes) so association Tables are included too
+    catalog = {}
+    for table in models_module.Base.metadata.tables.values():
+        fk_list = sorted(
+            [fk.parent.name, fk.column.table.name, fk.column.name]
+            for fk in table.foreign_keys
+        )
+        if fk_list:
+            catalog[table.name] = fk_list
+
+    # One [fk_column, referenced_table, referenced_column] triple per line keeps diffs readable
+    table_entries = []
+    for table_name in sorted(catalog):
+        fk_lines = ',\n'.join(f'    {json.dumps(fk)}' for fk in catalog[table_name])
+        table_entries.append(f'  {json.dumps(table_name)}: [\n{fk_lines}\n  ]')
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write('{\n' + ',\n'.join(table_entries) + '\n}\n')
+
+    print(f"[SUCCESS] Wrote FK catalog for {len(catalog)} tables to {output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate FK catalog JSON from SQLAlchemy models"
+    )
+    parser.add_argument(
+        '--models-path',
+        default='etl/models.py',
+        help='Path to models.py file (default: etl/models.py)'
+    )
+    parser.add_argument(
+        '--output',
+        default='etl/config/fk_constraints.json',
+        help='Output JSON file path (default: etl/config/fk_constraints.json)'
+    )
+
+    args = parser.parse_args()
+
+    models_path = Path(args.models_path)
+    if not models_path.exists():
+        print(f"[ERROR] Models file not found: {models_path}")
+        sys.exit(1)
+
+    try:
+        generate_fk_catalog(str(models_path), args.output)
+    except Exception as e:
+        print(f"[ERROR] Failed to generate FK catalog: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
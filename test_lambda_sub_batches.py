@@ -0,0 +1,108 @@
+"""Lambda sub-batch retries must give the same totals whether they run serially or concurrently.
+
+Runs entirely against a stand-in for db_query.database_query that keeps uom_master in a
+dict - no database or Lambda is touched. Like the real Lambda's result parsing, it fails
+multi-row RETURNING UPSERTs with "list index out of range", which sends stage_and_upsert
+down its bisecting sub-batch path. One row reuses an existing uom_name, so one sub-batch
+hits a real unique-constraint error and is bisected down to that row.
+"""
+import importlib
+import json
+import sys
+import threading
+import time
+import types
+
+import pandas as pd
+
+TEST_IDS = list(range(100, 120))
+BAD_ROW = 6
+COLUMN_TYPES = {'uom_id': 'integer', 'uom_name': 'text', 'uom_symbol': 'text'}
+
+
+class FakeUomMaster:
+    """database_query stand-in holding uom_master as {uom_id: uom_name}."""
+
+    def __init__(self):
+        self.rows = {999: 'DUP'}
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    @staticmethod
+    def _ok(rows):
+        return {"statusCode": 200, "body": json.dumps(rows)}
+
+    @staticmethod
+    def _error(message):
+        return {"statusCode": 500, "body": json.dumps({"error": message})}
+
+    def database_query(self, query, params=None):
+        sql = " ".join(query.split())
+        if 'information_schema.columns' in sql:
+            return self._ok([{"column_name": c} for c in COLUMN_TYPES])
+        if 'pg_attribute' in sql:
+            return self._ok([{"column_name": c, "data_type": t} for c, t in COLUMN_TYPES.items()])
+        if sql.startswith('SELECT COUNT(*) AS count FROM uom_master WHERE'):
+            with self.lock:
+                return self._ok([{"count": sum(1 for uom_id in params[0] if uom_id in self.rows)}])
+        if sql.startswith('WITH upserted AS'):
+            ids, names = params[0], params[1]
+            if len(ids) > 8:
+                return self._error("list index out of range")
+            with self.lock:
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                time.sleep(0.02)  # Long enough for concurrent sub-batches to overlap
+                with self.lock:
+                    taken = {name for uom_id, name in self.rows.items() if uom_id not in ids}
+                    if any(name in taken for name in names):
+                        return self._error('duplicate key value violates unique constraint "uk_uom_name"')
+                    inserted = sum(1 for uom_id in ids if uom_id not in self.rows)
+                    self.rows.update(zip(ids, names))
+                if 'RETURNING 1' in sql:
+                    return self._ok([{"count": len(ids)}])
+                return self._ok([{"inserted": inserted, "updated": len(ids) - inserted}])
+            finally:
+                with self.lock:
+                    self.in_flight -= 1
+        return self._error(f"unexpected statement: {sql[:200]}")
+
+
+def _load(monkeypatch, workers):
+    fake = FakeUomMaster()
+    fake_module = types.ModuleType('db_query')
+    fake_module.database_query = fake.database_query
+    monkeypatch.setitem(sys.modules, 'db_query', fake_module)
+    db_lambda = importlib.import_module('etl.db_lambda')
+    load = importlib.import_module('etl.load')
+    models = importlib.import_module('etl.models')
+    monkeypatch.setattr(db_lambda, 'db_query', fake_module)
+    monkeypatch.setattr(load, 'LAMBDA_SUB_BATCH_WORKERS', workers)
+    # Smallest batches, and no table-wide COUNT(*) - verification has to go through the sub-batches
+    monkeypatch.setattr(load, 'LAMBDA_BATCH_TARGET_BYTES', 1)
+    monkeypatch.setattr(load, '_count_table_rows', lambda conn, table: None)
+
+    df = pd.DataFrame({
+        'uom_id': TEST_IDS,
+        'uom_name': ['DUP' if i == BAD_ROW else f'U{i}' for i in range(len(TEST_IDS))],
+    })
+    inserted, updated, rejected, _ = load.stage_and_upsert(
+        db_lambda.LambdaConnection(), 'uom_master', df, ['uom_id'],
+        allow_fk_violations=True, models_module=models)
+    return (inserted, updated, rejected), sorted(fake.rows), fake.peak_in_flight
+
+
+def test_concurrent_sub_batches_match_serial(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)  # lambda_debug.log is written to the working directory
+
+    serial, serial_rows, serial_peak = _load(monkeypatch, 1)
+    concurrent, concurrent_rows, concurrent_peak = _load(monkeypatch, 4)
+
+    assert serial_peak == 1
+    assert concurrent_peak > 1
+    assert concurrent == serial
+    assert concurrent_rows == serial_rows
+    # Only the row with the duplicate uom_name is left out
+    assert serial_rows == sorted([999] + [uom_id for i, uom_id in enumerate(TEST_IDS) if i != BAD_ROW])